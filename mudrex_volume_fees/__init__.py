@@ -14,7 +14,8 @@ Example:
     >>> report = calc.calculate(since="2025-01-01", until="2025-01-30", symbol="BTCUSDT")
 """
 
+from mudrex_volume_fees.cache import ResponseCache
 from mudrex_volume_fees.calculator import VolumeFeesCalculator
 from mudrex_volume_fees.tiers import AlphaTier, FEE_RATES
 
-__all__ = ["VolumeFeesCalculator", "AlphaTier", "FEE_RATES"]
+__all__ = ["VolumeFeesCalculator", "ResponseCache", "AlphaTier", "FEE_RATES"]
@@ -0,0 +1,29 @@
+"""
+JSON encode/decode helpers: orjson (C implementation) when installed, stdlib json
+otherwise. Both produce the same dicts/lists; non-JSON values are written via str().
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup: pip install mudrex-volume-fees-calculator[fast]
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:  # e.g. ints beyond 64 bits; stdlib handles them
+            pass
+    return json.dumps(obj, default=str).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises ValueError on invalid input."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
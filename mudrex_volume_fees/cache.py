@@ -0,0 +1,126 @@
+"""
+On-disk cache for Mudrex API responses.
+
+Responses are stored as JSON under ~/.cache/mudrex_volume_fees/<namespace>/,
+one file per sha1(endpoint + params), as {"ts": ..., "data": ...}; order history
+is one entry per filter set holding every fetched order. Entries older
+than the TTL (MUDREX_VF_CACHE_TTL seconds, default 3600) are treated as misses, so
+re-running with a different alpha tier skips the HTTP round-trips (and, for order
+history fetched without a limit, so does a different symbol).
+
+The same directory also holds cursor.json, the high-water mark used for
+incremental order history fetches: the newest created_at seen (epoch ms) plus
+every order fetched so far. It does not expire. Files are read and written with
+orjson when it is installed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from mudrex_volume_fees import _json
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "mudrex_volume_fees")
+DEFAULT_TTL = 3600.0
+CURSOR_FILE = "cursor.json"
+
+
+def account_namespace(api_secret: str) -> str:
+    """Stable per-account cache directory name that does not reveal the secret."""
+    return hashlib.sha1(api_secret.encode("utf-8")).hexdigest()[:16]
+
+
+def _env_ttl() -> float:
+    try:
+        return float(os.environ.get("MUDREX_VF_CACHE_TTL", DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+class ResponseCache:
+    """
+    TTL cache of raw API responses keyed by endpoint and request params.
+
+    Entries are written whole, once per complete fetch, and each key is its own
+    file written atomically (temp file + rename), so concurrent runs sharing a
+    cache directory never read a partial entry.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "default",
+        cache_dir: Optional[str] = None,
+        ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            namespace: Per-account subdirectory (see account_namespace) so
+                different API secrets never share cached responses.
+            cache_dir: Root directory (default: ~/.cache/mudrex_volume_fees).
+            ttl: Entry lifetime in seconds (default: MUDREX_VF_CACHE_TTL or 3600).
+        """
+        self._dir = os.path.join(cache_dir or DEFAULT_CACHE_DIR, namespace)
+        self._ttl = _env_ttl() if ttl is None else float(ttl)
+
+    @property
+    def directory(self) -> str:
+        return self._dir
+
+    def _read_json(self, path: str) -> Optional[Any]:
+        try:
+            with open(path, "rb") as f:
+                return _json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path: str, payload: Any) -> None:
+        tmp = None
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(_json.dumps(payload))
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def _path(self, endpoint: str, params: Dict[str, Any]) -> str:
+        key = json.dumps([endpoint, params], sort_keys=True, default=str)
+        return os.path.join(self._dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, endpoint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Cached response data, or None if missing, expired or unreadable."""
+        entry = self._read_json(self._path(endpoint, params))
+        if not isinstance(entry, dict):
+            return None
+        ts = entry.get("ts")
+        if not isinstance(ts, (int, float)) or time.time() - ts > self._ttl:
+            return None
+        return entry.get("data")
+
+    def set(self, endpoint: str, params: Dict[str, Any], data: Any) -> None:
+        """Store response data; failures to write are ignored (cache is best-effort)."""
+        self._write_json(self._path(endpoint, params), {"ts": time.time(), "data": data})
+
+    def load_cursor(self) -> Optional[Dict[str, Any]]:
+        """Incremental-fetch cursor {"max_created_at_ms": int, "orders": [...]}, or None."""
+        cursor = self._read_json(os.path.join(self._dir, CURSOR_FILE))
+        if not isinstance(cursor, dict) or not isinstance(cursor.get("orders"), list):
+            return None
+        if not isinstance(cursor.get("max_created_at_ms"), (int, float)):
+            return None
+        return cursor
+
+    def save_cursor(self, max_created_at_ms: int, orders: List[Dict[str, Any]]) -> None:
+        """Persist the incremental-fetch cursor (best-effort, like set)."""
+        self._write_json(
+            os.path.join(self._dir, CURSOR_FILE),
+            {"max_created_at_ms": int(max_created_at_ms), "orders": orders},
+        )
@@ -6,33 +6,83 @@ filters by time/symbol and optionally by order source (API vs manual), and compu
 notional volume and estimated fees by alpha tier.
 """
 
-import json
+import atexit
 import os
+import queue
+import sys
+import threading
 import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional, Union
+from typing import IO, Any, DefaultDict, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # Indian Standard Time (UTC+5:30) - all date/time handling is IST-only
 IST = timezone(timedelta(hours=5, minutes=30))
 
-from mudrex_volume_fees.tiers import AlphaTier, FEE_RATES, get_fee_rate
+try:
+    from ciso8601 import parse_datetime as _ciso8601_parse
+except ImportError:  # optional speedup: pip install mudrex-volume-fees-calculator[fast]
+    _ciso8601_parse = None
+
+from mudrex_volume_fees import _json
+from mudrex_volume_fees.cache import ResponseCache
+from mudrex_volume_fees.tiers import AlphaTier, get_fee_rate
 
 # #region agent log
+# Off unless MUDREX_VF_DEBUG or MUDREX_VF_DEBUG_LOG is set; hot-path call sites check
+# _DEBUG_ENABLED first so they do not even build their data dicts.
 _DEBUG_LOG_PATH = os.environ.get("MUDREX_VF_DEBUG_LOG", os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".cursor", "debug.log")))
-def _debug_log(hypothesis_id: str, location: str, message: str, data: Optional[Dict] = None) -> None:
+_DEBUG_ENABLED = bool(os.environ.get("MUDREX_VF_DEBUG") or os.environ.get("MUDREX_VF_DEBUG_LOG"))
+_debug_file: Optional[IO[str]] = None
+_debug_lock = threading.Lock()
+
+
+def _write_debug_log(hypothesis_id: str, location: str, message: str, data: Optional[Dict] = None) -> None:
+    global _debug_file
     try:
-        log_dir = os.path.dirname(_DEBUG_LOG_PATH)
-        if log_dir:
-            os.makedirs(log_dir, exist_ok=True)
-        with open(_DEBUG_LOG_PATH, "a") as f:
-            f.write(json.dumps({"sessionId": "debug-session", "hypothesisId": hypothesis_id, "location": location, "message": message, "data": data or {}, "timestamp": int(time.time() * 1000)}) + "\n")
+        line = _json.dumps({"sessionId": "debug-session", "hypothesisId": hypothesis_id, "location": location, "message": message, "data": data or {}, "timestamp": int(time.time() * 1000)}).decode("utf-8") + "\n"
+        with _debug_lock:
+            if _debug_file is None:
+                log_dir = os.path.dirname(_DEBUG_LOG_PATH)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                # Opened once and buffered; flushed/closed at interpreter exit
+                _debug_file = open(_DEBUG_LOG_PATH, "a")
+                atexit.register(_debug_file.close)
+            _debug_file.write(line)
     except Exception:
         pass
+
+
+def _skip_debug_log(hypothesis_id: str, location: str, message: str, data: Optional[Dict] = None) -> None:
+    return None
+
+
+_debug_log = _write_debug_log if _DEBUG_ENABLED else _skip_debug_log
 # #endregion
 
+# Epoch ms range representable as datetime (years 1..9999)
+_MIN_EPOCH_MS = -62135596800000
+_MAX_EPOCH_MS = 253402300799999
+
+# Order statuses (upper-cased) that contribute volume
+_FILLED_STATUSES = frozenset({"FILLED", "PARTIALLY_FILLED"})
+# Order statuses (upper-cased) after which an order no longer changes
+_TERMINAL_STATUSES = frozenset({"FILLED", "CANCELLED", "CANCELED", "REJECTED", "EXPIRED"})
+
 # Keys the API might use for order source (API vs web/ios/android)
 SOURCE_KEYS = ("source", "order_source", "origin")
 
+ORDER_HISTORY_ENDPOINT = "/futures/orders/history"
+ORDER_HISTORY_PER_PAGE = 100
+# Max concurrent page requests when fetching order history
+MAX_FETCH_WORKERS = 8
+# Max fetched pages buffered ahead of the aggregation loop
+PREFETCH_PAGES = 2 * MAX_FETCH_WORKERS
+# Cache key for fee history (fetched through the SDK, not a raw endpoint)
+FEE_HISTORY_CACHE_KEY = "fees.get_history"
+
 
 def _norm_dt(dt: Optional[datetime]) -> Optional[datetime]:
     """Normalize to IST for comparison; naive datetimes treated as IST."""
@@ -43,46 +93,100 @@ def _norm_dt(dt: Optional[datetime]) -> Optional[datetime]:
     return dt.astimezone(IST)
 
 
+def _parse_iso_ciso8601(s: str) -> datetime:
+    """
+    ISO 8601 via ciso8601 (C parser), falling back to fromisoformat for forms it rejects.
+
+    ciso8601 also accepts forms fromisoformat does not (e.g. "2025-01", "T24:00"),
+    so it only gets strings that start with a full YYYY-MM-DD date followed by
+    nothing or a "T" time before hour 24; the result then matches the stdlib path.
+    """
+    if (
+        len(s) >= 10
+        and s[4] == "-"
+        and s[7] == "-"
+        and s[:4].isdigit()
+        and s[5:7].isdigit()
+        and s[8:10].isdigit()
+        and (len(s) == 10 or (s[10] == "T" and s[11:13] != "24"))
+    ):
+        try:
+            return _ciso8601_parse(s)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(s)
+
+
+# ISO string parser used by _parse_dt; raises ValueError on invalid input
+_parse_iso = _parse_iso_ciso8601 if _ciso8601_parse is not None else datetime.fromisoformat
+
+
+def _from_epoch(value: float) -> Optional[datetime]:
+    """IST datetime from Unix seconds or milliseconds (values above 1e12 are ms)."""
+    if value > 1e12:
+        value = value / 1000
+    try:
+        return datetime.fromtimestamp(value, tz=IST)
+    except (ValueError, OSError, OverflowError):
+        return None
+
+
+def _ms_bounds(
+    since_dt: Optional[datetime], until_dt: Optional[datetime]
+) -> Tuple[Optional[float], Optional[float]]:
+    """Inclusive time-range bounds as epoch ms (None = unbounded) for _epoch_ms values."""
+    since_ms = _norm_dt(since_dt).timestamp() * 1000 if since_dt is not None else None
+    until_ms = _norm_dt(until_dt).timestamp() * 1000 if until_dt is not None else None
+    return since_ms, until_ms
+
+
+def _epoch_ms(value: Any) -> Optional[float]:
+    """
+    created_at as Unix epoch ms, or None if unparseable. Epoch numbers in
+    datetime's range are converted arithmetically without building a datetime.
+    """
+    kind = type(value)
+    if kind is int or kind is float:
+        ms = value if value > 1e12 else value * 1000
+        if _MIN_EPOCH_MS <= ms <= _MAX_EPOCH_MS:
+            return ms
+    dt = _parse_dt(value)
+    return dt.timestamp() * 1000 if dt is not None else None
+
+
 def _parse_dt(value: Any) -> Optional[datetime]:
     # #region agent log
-    if value is not None:
+    if _DEBUG_ENABLED and value is not None:
         if (isinstance(value, str) and (not value or value.strip() == "")) or (isinstance(value, (int, float)) and value == 0):
             _debug_log("H3", "calculator.py:_parse_dt", "edge input", {"type": type(value).__name__, "repr": repr(value)[:80]})
     # #endregion
     if value is None:
         return None
+    # Epoch numbers are the common case from the API: one exact type check, no
+    # isinstance chain or string handling
+    kind = type(value)
+    if kind is int or kind is float:
+        return _from_epoch(value)
     if isinstance(value, datetime):
         return _norm_dt(value)
-    # Handle numeric string (API may return Unix ms as "1738234567890")
-    if isinstance(value, str) and value.strip():
-        stripped = value.strip()
-        if stripped.isdigit() or (stripped.replace(".", "", 1).replace("-", "", 1).isdigit()):
+    if isinstance(value, str):
+        s = value.strip()
+        # Numeric string (API may return Unix ms as "1738234567890")
+        if s.isdigit() or s.replace(".", "", 1).replace("-", "", 1).isdigit():
             try:
-                value = float(stripped)
-            except ValueError:
+                epoch = float(s)
+            except ValueError:  # e.g. "2025-01": passes the precheck, not a number
                 pass
             else:
-                if value > 1e12:
-                    value = value / 1000
-                try:
-                    return datetime.fromtimestamp(value, tz=timezone.utc).astimezone(IST)
-                except (ValueError, OSError):
-                    pass
-    if isinstance(value, (int, float)):
-        if value > 1e12:
-            value = value / 1000
-        try:
-            out = datetime.fromtimestamp(value, tz=timezone.utc).astimezone(IST)
-            return out
-        except (ValueError, OSError):
-            return None
-    if isinstance(value, str):
+                dt = _from_epoch(epoch)
+                if dt is not None:
+                    return dt
         try:
             # Normalize "T" and "Z" for ISO
-            s = value.strip().replace("Z", "+00:00")
+            s = s.replace("Z", "+00:00")
             if "T" not in s and " " in s and "+" not in s and s.count("-") <= 2:
                 s = s.replace(" ", "T", 1)
-            dt = datetime.fromisoformat(s)
+            dt = _parse_iso(s)
             if dt.tzinfo is not None:
                 dt = dt.astimezone(IST)
             else:
@@ -90,6 +194,9 @@ def _parse_dt(value: Any) -> Optional[datetime]:
             return dt
         except ValueError:
             pass
+        return None
+    if isinstance(value, (int, float)):
+        return _from_epoch(value)
     return None
 
 
@@ -107,19 +214,19 @@ def _is_api_sourced(order: Dict[str, Any]) -> bool:
     return True  # unknown -> include (all-volume mode when API doesn't expose source)
 
 
-def _order_volume_contribution(order: Dict[str, Any]) -> float:
-    """Notional volume for one order: filled_quantity * price."""
-    filled = order.get("filled_quantity") or order.get("filled_size") or "0"
-    price = order.get("price") or order.get("order_price") or "0"
-    try:
-        return float(filled) * float(price)
-    except (ValueError, TypeError):
-        return 0.0
+def _fee_fields(fee: Any) -> Tuple[Any, Any]:
+    """(created_at, fee_amount) of an SDK fee object or dict."""
+    if isinstance(fee, dict):
+        return fee.get("created_at"), fee.get("fee_amount", "0")
+    return getattr(fee, "created_at", None), getattr(fee, "fee_amount", "0")
 
 
-def _order_is_filled(order: Dict[str, Any]) -> bool:
-    status = (order.get("status") or "").upper()
-    return status in ("FILLED", "PARTIALLY_FILLED")
+def _fee_record(fee: Any) -> Dict[str, Any]:
+    """Plain JSON-friendly dict (created_at, fee_amount) for an SDK fee object or dict."""
+    created, amount = _fee_fields(fee)
+    if isinstance(created, datetime):
+        created = created.isoformat()
+    return {"created_at": created, "fee_amount": amount}
 
 
 def _fetch_actual_fees(
@@ -127,92 +234,587 @@ def _fetch_actual_fees(
     since_dt: Optional[datetime] = None,
     until_dt: Optional[datetime] = None,
     symbol: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
 ) -> tuple:
     """
     Fetch fee history via client.fees.get_history(), filter by time/symbol client-side.
+    The time range is also passed as start_time/end_time (epoch ms) for SDKs that
+    accept them. With a cache, the fetched history is reused for the rest of the
+    (IST) day / TTL; fees are only converted to JSON-friendly records when cached,
+    otherwise SDK datetimes are compared directly. Uses the same epoch-ms parsing
+    and bounds as the order loop.
     Returns (total_actual_fees, fee_count).
     """
-    try:
-        fees = client.fees.get_history(limit=None, symbol=symbol)
-    except Exception:
-        return 0.0, 0
+    range_params: Dict[str, int] = {}
+    if since_dt is not None:
+        range_params["start_time"] = _to_epoch_ms(since_dt)
+    if until_dt is not None:
+        range_params["end_time"] = _to_epoch_ms(until_dt)
+    cache_params = {"symbol": symbol, "day": datetime.now(IST).date().isoformat(), **range_params}
+    fees = cache.get(FEE_HISTORY_CACHE_KEY, cache_params) if cache is not None else None
+    if not isinstance(fees, list):  # missing, or a malformed entry: fetch again
+        try:
+            try:
+                history = client.fees.get_history(limit=None, symbol=symbol, **range_params)
+            except TypeError:
+                if not range_params:
+                    raise
+                # SDK without server-side time filters
+                history = client.fees.get_history(limit=None, symbol=symbol)
+            fees = [_fee_record(fee) for fee in history] if cache is not None else list(history)
+        except Exception:
+            return 0.0, 0
+        if cache is not None:
+            cache.set(FEE_HISTORY_CACHE_KEY, cache_params, fees)
+    need_dt = since_dt is not None or until_dt is not None
+    since_ms, until_ms = _ms_bounds(since_dt, until_dt)
     total = 0.0
     count = 0
     for fee in fees:
-        created = getattr(fee, "created_at", None) if hasattr(fee, "created_at") else None
-        if created is None and isinstance(fee, dict):
-            created = fee.get("created_at")
-        created_dt = _parse_dt(created)
+        created, amount = _fee_fields(fee)
+        if need_dt:
+            if isinstance(created, datetime):
+                created_ms = _norm_dt(created).timestamp() * 1000
+            else:
+                created_ms = _epoch_ms(created)
+            # Exclude fees with missing created_at when date filter is set (H7 fix)
+            if created_ms is None:
+                # #region agent log
+                if _DEBUG_ENABLED:
+                    _debug_log("H7", "calculator.py:_fetch_actual_fees", "fee missing created_at with date filter", {"since": str(since_dt), "until": str(until_dt)})
+                # #endregion
+                continue
+            if since_ms is not None and created_ms < since_ms:
+                continue
+            if until_ms is not None and created_ms > until_ms:
+                continue
+        try:
+            total += float(amount)
+            count += 1
+        except (ValueError, TypeError):
+            pass
+    return total, count
+
+
+def _page_items(resp: Any, page: int) -> List[Any]:
+    """Extract the list of order items from one order-history page response."""
+    data = resp.get("data", resp) if isinstance(resp, dict) else resp
+    # #region agent log
+    if _DEBUG_ENABLED:
+        _debug_log("H2", "calculator.py:fetch_raw_order_history", "response shape", {"resp_type": type(resp).__name__, "data_type": type(data).__name__, "page": page, "is_data_list": isinstance(data, list)})
+        if not isinstance(resp, dict):
+            _debug_log("H2", "calculator.py:fetch_raw_order_history", "resp not dict", {"resp_type": type(resp).__name__})
+    # #endregion
+    if isinstance(data, list):
+        items = data
+    else:
+        items = data.get("items", data.get("data", [])) if isinstance(data, dict) else []
+    if not isinstance(items, list):
         # #region agent log
-        if created_dt is None and (since_dt or until_dt):
-            _debug_log("H7", "calculator.py:_fetch_actual_fees", "fee missing created_at with date filter", {"since": str(since_dt), "until": str(until_dt)})
+        _debug_log("H2", "calculator.py:fetch_raw_order_history", "items not list", {"items_type": type(items).__name__})
         # #endregion
-        # Exclude fees with missing created_at when date filter is set (H7 fix)
-        if (since_dt or until_dt) and created_dt is None:
+        items = []
+    return items
+
+
+def _total_pages(resp: Any, per_page: int) -> Optional[int]:
+    """Page count from pagination metadata (total_pages or total), or None if absent."""
+    if not isinstance(resp, dict):
+        return None
+    data = resp.get("data")
+    for container in (data, resp):
+        if not isinstance(container, dict):
             continue
-        if since_dt and created_dt:
+        for key in ("total_pages", "last_page"):
             try:
-                if _norm_dt(created_dt) < _norm_dt(since_dt):
-                    continue
-            except TypeError:
+                return max(1, int(container[key]))
+            except (KeyError, ValueError, TypeError):
                 pass
-        if until_dt and created_dt:
+        for key in ("total", "total_count"):
             try:
-                if _norm_dt(created_dt) > _norm_dt(until_dt):
-                    continue
-            except TypeError:
+                return max(1, -(-int(container[key]) // per_page))
+            except (KeyError, ValueError, TypeError):
                 pass
-        amount = getattr(fee, "fee_amount", "0") if hasattr(fee, "fee_amount") else (fee.get("fee_amount", "0") if isinstance(fee, dict) else "0")
+    return None
+
+
+def _to_epoch_ms(dt: datetime) -> int:
+    """Unix epoch milliseconds for a datetime (naive treated as IST)."""
+    return int(_norm_dt(dt).timestamp() * 1000)
+
+
+def _page_precedes(items: List[Any], since_dt: datetime) -> bool:
+    """
+    True if a newest-first page ends before since_dt, so later pages are older still.
+
+    The API is assumed to return history newest first; this is only trusted when
+    every row of the page has a created_at and the whole page is non-increasing,
+    so a page that is not sorted never stops pagination.
+    """
+    prev_ms = None
+    for item in items:
+        created_ms = _epoch_ms(item.get("created_at")) if isinstance(item, dict) else None
+        if created_ms is None or (prev_ms is not None and created_ms > prev_ms):
+            return False
+        prev_ms = created_ms
+    return prev_ms < _norm_dt(since_dt).timestamp() * 1000
+
+
+def _order_history_filters(
+    since_dt: Optional[datetime], until_dt: Optional[datetime], symbol: Optional[str]
+) -> Dict[str, Any]:
+    """Server-side order history query params for a time range / symbol."""
+    filters: Dict[str, Any] = {}
+    if since_dt is not None:
+        filters["start_time"] = _to_epoch_ms(since_dt)
+    if until_dt is not None:
+        filters["end_time"] = _to_epoch_ms(until_dt)
+    if symbol:
+        filters["symbol"] = symbol
+    return filters
+
+
+def _iter_order_pages(
+    client: Any,
+    limit: Optional[int] = None,
+    since_dt: Optional[datetime] = None,
+    until_dt: Optional[datetime] = None,
+    symbol: Optional[str] = None,
+    max_workers: int = MAX_FETCH_WORKERS,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield order history one page (list of raw order dicts) at a time, in page order;
+    see _fetch_order_pages for filters, early stop and concurrency.
+
+    With a cache, the whole history for a filter set (and limit) is one cache entry
+    with one timestamp, written only after a complete fetch. Offset pages of a
+    newest-first history shift as new orders arrive, so pages cached at different
+    times could repeat or skip orders; entries are therefore never per page.
+    Without a limit, symbol is not sent or keyed when caching: one entry then
+    serves every symbol, and the pages yielded are filtered by symbol locally.
+    """
+    if cache is None:
+        yield from _fetch_order_pages(client, limit, since_dt, until_dt, symbol, max_workers)
+        return
+    local_symbol = None
+    if not limit and symbol:
+        local_symbol = symbol.strip().upper()
+        symbol = None
+
+    def select(page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if local_symbol is None:
+            return page
+        return [
+            o for o in page
+            if str(o.get("symbol") or o.get("asset_id") or "").strip().upper() == local_symbol
+        ]
+
+    params = {"per_page": ORDER_HISTORY_PER_PAGE, "limit": limit, **_order_history_filters(since_dt, until_dt, symbol)}
+    cached = cache.get(ORDER_HISTORY_ENDPOINT, params)
+    if isinstance(cached, list):
+        for start in range(0, len(cached), ORDER_HISTORY_PER_PAGE):
+            yield select(cached[start : start + ORDER_HISTORY_PER_PAGE])
+        return
+    orders: List[Dict[str, Any]] = []
+    for page in _fetch_order_pages(client, limit, since_dt, until_dt, symbol, max_workers):
+        orders.extend(page)
+        yield select(page)
+    # Not reached when the consumer stops early, so partial histories are not cached
+    cache.set(ORDER_HISTORY_ENDPOINT, params, orders)
+
+
+def _fetch_order_pages(
+    client: Any,
+    limit: Optional[int],
+    since_dt: Optional[datetime],
+    until_dt: Optional[datetime],
+    symbol: Optional[str],
+    max_workers: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Fetch order history pages from the API and yield their orders, in page order.
+
+    since_dt/until_dt/symbol are sent as start_time/end_time (epoch ms) and symbol
+    query params so the API can filter server-side; callers still filter locally in
+    case the endpoint ignores them. Pagination stops early once a newest-first page
+    ends before since_dt.
+
+    Page 1 is fetched first to read pagination metadata (total_pages/total); the
+    remaining pages are then fetched concurrently, up to max_workers at a time.
+    When the API gives no total, pages are requested in windows that double in
+    size (up to max_workers) until a short or empty page. Closing the generator
+    early cancels page requests that have not started.
+    """
+    # #region agent log
+    _debug_log("H0", "calculator.py:fetch_raw_order_history", "fetch started", {"limit": limit, "since": str(since_dt), "until": str(until_dt), "symbol": symbol})
+    # #endregion
+    per_page = ORDER_HISTORY_PER_PAGE
+    workers = max(1, max_workers)
+    filters = _order_history_filters(since_dt, until_dt, symbol)
+
+    def fetch_page(page: int) -> Any:
+        return client.get(ORDER_HISTORY_ENDPOINT, {"page": page, "per_page": per_page, **filters})
+
+    count = 0
+
+    def take(items: List[Any]) -> List[Dict[str, Any]]:
+        nonlocal count
+        orders = [item for item in items if isinstance(item, dict)]
+        if limit and count + len(orders) > limit:
+            orders = orders[: limit - count]
+        count += len(orders)
+        return orders
+
+    def is_last_page(items: List[Any]) -> bool:
+        if (limit and count >= limit) or not items or len(items) < per_page:
+            return True
+        return since_dt is not None and _page_precedes(items, since_dt)
+
+    first = fetch_page(1)
+    items = _page_items(first, 1)
+    yield take(items)
+    if is_last_page(items):
+        return
+
+    last_page = _total_pages(first, per_page)
+    if limit:
+        limit_pages = -(-limit // per_page)
+        last_page = min(last_page, limit_pages) if last_page else limit_pages
+    window = workers if last_page else min(2, workers)
+    next_page = 2
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while last_page is None or next_page <= last_page:
+            stop = next_page + window if last_page is None else min(next_page + window, last_page + 1)
+            futures = [pool.submit(fetch_page, page) for page in range(next_page, stop)]
+            try:
+                for page, future in zip(range(next_page, stop), futures):
+                    items = _page_items(future.result(), page)
+                    yield take(items)
+                    if is_last_page(items):
+                        return
+            finally:
+                # No-op for finished requests; drops queued ones on early exit
+                for future in futures:
+                    future.cancel()
+            next_page = stop
+            window = min(window * 2, workers)
+
+
+def iter_raw_order_history(
+    client: Any,
+    limit: Optional[int] = None,
+    since_dt: Optional[datetime] = None,
+    until_dt: Optional[datetime] = None,
+    symbol: Optional[str] = None,
+    max_workers: int = MAX_FETCH_WORKERS,
+    cache: Optional[ResponseCache] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream raw order dicts from the Mudrex API (Order history endpoint), newest
+    page first, so only the pages in flight are held in memory. Arguments as in
+    fetch_raw_order_history.
+    """
+    for orders in _iter_order_pages(
+        client,
+        limit=limit,
+        since_dt=since_dt,
+        until_dt=until_dt,
+        symbol=symbol,
+        max_workers=max_workers,
+        cache=cache,
+    ):
+        yield from orders
+
+
+def _prefetch_pages(
+    pages: Iterator[List[Dict[str, Any]]],
+    max_pages: int = PREFETCH_PAGES,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Run a page iterator on a background thread and yield its orders as pages arrive.
+
+    The producer spends its time in socket I/O while the caller aggregates earlier
+    pages, so fetch and aggregation overlap. At most max_pages pages are buffered.
+    Exceptions from the producer are re-raised here; closing this generator stops
+    the producer (and closes the page iterator) after its current page.
+    """
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_pages))
+    stop = threading.Event()
+    done = object()
+
+    def produce() -> None:
         try:
-            total += float(amount)
-            count += 1
-        except (ValueError, TypeError):
-            pass
-    return total, count
+            for page in pages:
+                if stop.is_set():
+                    break
+                buffer.put(page)
+        except BaseException as exc:  # handed to the consumer
+            if not stop.is_set():
+                buffer.put(exc)
+        else:
+            if not stop.is_set():
+                buffer.put(done)
+        finally:
+            close = getattr(pages, "close", None)
+            if close is not None:
+                close()
+
+    producer = threading.Thread(target=produce, name="mudrex-vf-fetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full buffer
+        while True:
+            try:
+                buffer.get_nowait()
+            except queue.Empty:
+                break
 
 
 def fetch_raw_order_history(
     client: Any,
     limit: Optional[int] = None,
+    since_dt: Optional[datetime] = None,
+    until_dt: Optional[datetime] = None,
+    symbol: Optional[str] = None,
+    max_workers: int = MAX_FETCH_WORKERS,
+    cache: Optional[ResponseCache] = None,
 ) -> List[Dict[str, Any]]:
     """
     Fetch raw order history from Mudrex API (Order history endpoint).
     Returns list of raw order dicts so we can read source/order_source if present.
+
+    since_dt/until_dt/symbol are passed to the API as server-side filters, limit
+    caps the number of orders, max_workers bounds concurrent page requests and
+    cache (optional ResponseCache) reuses a complete earlier fetch with the same
+    filters (without a limit, one fetch serves every symbol); see _iter_order_pages.
     """
-    # #region agent log
-    _debug_log("H0", "calculator.py:fetch_raw_order_history", "fetch started", {"limit": limit})
-    # #endregion
-    out: List[Dict[str, Any]] = []
-    page = 1
-    per_page = 100
-    while True:
-        resp = client.get("/futures/orders/history", {"page": page, "per_page": per_page})
-        data = resp.get("data", resp) if isinstance(resp, dict) else resp
+    return list(
+        iter_raw_order_history(
+            client,
+            limit=limit,
+            since_dt=since_dt,
+            until_dt=until_dt,
+            symbol=symbol,
+            max_workers=max_workers,
+            cache=cache,
+        )
+    )
+
+
+def _refetch_from_ms(cursor: Dict[str, Any]) -> Optional[float]:
+    """
+    Epoch ms from which an incremental run must re-fetch: the cursor's high-water
+    mark, or the created_at of its oldest order still in a non-terminal status
+    (open or partially filled orders can still fill). None if such an order has
+    no usable created_at, so the whole history must be re-fetched.
+    """
+    mark = cursor["max_created_at_ms"]
+    for order in cursor["orders"]:
+        if not isinstance(order, dict):
+            continue
+        status = order.get("status")
+        if status and str(status).upper() in _TERMINAL_STATUSES:
+            continue
+        created_ms = _epoch_ms(order.get("created_at"))
+        if created_ms is None:
+            return None
+        mark = min(mark, created_ms)
+    return mark
+
+
+def fetch_incremental_order_history(
+    client: Any,
+    cache: ResponseCache,
+    max_workers: int = MAX_FETCH_WORKERS,
+) -> List[Dict[str, Any]]:
+    """
+    Full order history, fetching only orders that are new or may have changed
+    since the cache's cursor.
+
+    The first call fetches everything and saves it with the newest created_at as
+    a high-water mark. Later calls request history from that mark onwards (so
+    pagination stops as soon as pages reach already-seen orders), or from the
+    oldest cursor order not yet in a terminal status (filled, cancelled, rejected,
+    expired) if that is older, so orders that fill after being cached are picked
+    up. Fetched rows go ahead of the cached ones, replacing them by order_id.
+
+    Offset pages can shift while they are fetched, so the same order may come
+    back twice; only the first copy of each order_id is kept, so a duplicate is
+    never saved into the cursor and counted on later runs.
+    """
+    cursor = cache.load_cursor()
+    if cursor is None:
+        fetched = fetch_raw_order_history(client, max_workers=max_workers)
+    else:
+        from_ms = _refetch_from_ms(cursor)
+        since_dt = datetime.fromtimestamp(from_ms / 1000, tz=timezone.utc) if from_ms is not None else None
+        new_orders = fetch_raw_order_history(client, since_dt=since_dt, max_workers=max_workers)
+        fetched = new_orders + [o for o in cursor["orders"] if isinstance(o, dict)]
+    orders: List[Dict[str, Any]] = []
+    seen = set()
+    for order in fetched:
+        order_id = order.get("order_id", order.get("id"))
+        if order_id is not None:
+            if order_id in seen:
+                continue
+            seen.add(order_id)
+        orders.append(order)
+    max_ms = cursor["max_created_at_ms"] if cursor is not None else 0
+    for order in orders:
+        created = _parse_dt(order.get("created_at"))
+        if created is not None:
+            max_ms = max(max_ms, _to_epoch_ms(created))
+    if max_ms:
+        cache.save_cursor(max_ms, orders)
+    return orders
+
+
+def _aggregate_orders(
+    orders: Iterable[Dict[str, Any]],
+    since_dt: Optional[datetime],
+    until_dt: Optional[datetime],
+    symbol_norm: Optional[str],
+    count_only_api_sourced: bool,
+) -> Tuple[float, int, Dict[str, float], bool]:
+    """
+    Filter and sum raw orders; the per-order hot loop of calculate().
+    by_symbol keys are upper-cased symbols.
+
+    Kept at module scope with helpers bound to locals so each iteration uses
+    fast local lookups instead of global/attribute ones.
+    Returns (total_volume, order_count, by_symbol, source_available).
+    """
+    epoch_ms = _epoch_ms
+    filled_statuses = _FILLED_STATUSES
+    is_api_sourced = _is_api_sourced
+    to_float = float
+    source_keys = SOURCE_KEYS
+    symbol_names: Dict[Any, str] = {}
+    if symbol_norm:
+        symbol_norm = sys.intern(symbol_norm)
+    # created_at is only parsed when a time filter needs it, and compared as epoch
+    # ms against bounds computed once
+    need_dt = since_dt is not None or until_dt is not None
+    since_ms, until_ms = _ms_bounds(since_dt, until_dt)
+
+    total_volume = 0.0
+    by_symbol: DefaultDict[str, float] = defaultdict(float)
+    order_count = 0
+    source_available = False
+
+    for order in orders:
+        # Cheap field checks first so timestamps are only parsed for orders that
+        # could count (filled, matching symbol/source)
+        raw_sym = order.get("symbol") or order.get("asset_id") or ""
+        sym = symbol_names.get(raw_sym)
+        if sym is None:
+            # Normalize (strip + upper) and intern each distinct symbol once
+            sym = symbol_names[raw_sym] = sys.intern(str(raw_sym).strip().upper())
+        if symbol_norm and sym != symbol_norm:
+            continue
+        status = order.get("status")
+        if not status or status.upper() not in filled_statuses:
+            continue
+        if count_only_api_sourced and not is_api_sourced(order):
+            continue  # skip non-API when filtering by source
+        if need_dt:
+            created_ms = epoch_ms(order.get("created_at"))
+            # Exclude orders with missing created_at when date filter is set (H1)
+            if created_ms is None:
+                # #region agent log
+                if _DEBUG_ENABLED:
+                    if order.get("created_at") is not None:
+                        _debug_log("H3", "calculator.py:_aggregate_orders", "order created_at parse returned None", {"order_id": order.get("order_id", order.get("id", ""))[:24]})
+                    _debug_log("H1", "calculator.py:_aggregate_orders", "order missing created_at with date filter", {"since": str(since_dt), "until": str(until_dt), "order_id": order.get("order_id", order.get("id", ""))[:24]})
+                # #endregion
+                continue
+            if since_ms is not None and created_ms < since_ms:
+                continue
+            if until_ms is not None and created_ms > until_ms:
+                continue
+        # Track if we ever saw a source-like field; once seen, stop looking
+        if not source_available:
+            for k in source_keys:
+                if order.get(k) is not None:
+                    source_available = True
+                    break
+        # Notional volume filled_quantity * price; one try around both float parses
+        try:
+            vol = to_float(order.get("filled_quantity") or order.get("filled_size") or "0") * to_float(order.get("price") or order.get("order_price") or "0")
+        except (ValueError, TypeError):
+            continue
+        if vol <= 0:
+            continue
         # #region agent log
-        _debug_log("H2", "calculator.py:fetch_raw_order_history", "response shape", {"resp_type": type(resp).__name__, "data_type": type(data).__name__, "page": page, "is_data_list": isinstance(data, list)})
-        if not isinstance(resp, dict):
-            _debug_log("H2", "calculator.py:fetch_raw_order_history", "resp not dict", {"resp_type": type(resp).__name__})
+        if _DEBUG_ENABLED and not need_dt and _parse_dt(order.get("created_at")) is None:
+            _debug_log("H1", "calculator.py:_aggregate_orders", "order with missing created_at included in volume", {"vol": vol, "order_id": order.get("order_id", order.get("id", ""))[:24]})
         # #endregion
-        if isinstance(data, list):
-            items = data
-        else:
-            items = data.get("items", data.get("data", [])) if isinstance(data, dict) else []
-        if not isinstance(items, list):
-            # #region agent log
-            _debug_log("H2", "calculator.py:fetch_raw_order_history", "items not list", {"items_type": type(items).__name__})
-            # #endregion
-            items = []
-        if not items:
-            break
-        for item in items:
-            if isinstance(item, dict):
-                out.append(item)
-        if limit and len(out) >= limit:
-            return out[:limit]
-        if len(items) < per_page:
-            break
-        page += 1
-    return out
+        total_volume += vol
+        order_count += 1
+        if sym:
+            by_symbol[sym] += vol
+
+    return total_volume, order_count, dict(by_symbol), source_available
+
+
+def _aggregate_all_orders(
+    orders: Iterable[Dict[str, Any]],
+) -> Tuple[float, int, Dict[str, float], bool]:
+    """
+    _aggregate_orders specialized for no time/symbol filter and no source filter:
+    only the filled check, volume and accumulation remain in the loop, and symbols
+    are normalized only for orders that count. Same return value.
+    """
+    filled_statuses = _FILLED_STATUSES
+    to_float = float
+    source_keys = SOURCE_KEYS
+    symbol_names: Dict[Any, str] = {}
+
+    total_volume = 0.0
+    by_symbol: DefaultDict[str, float] = defaultdict(float)
+    order_count = 0
+    source_available = False
+
+    for order in orders:
+        status = order.get("status")
+        if not status or status.upper() not in filled_statuses:
+            continue
+        if not source_available:
+            for k in source_keys:
+                if order.get(k) is not None:
+                    source_available = True
+                    break
+        # Notional volume filled_quantity * price; one try around both float parses
+        try:
+            vol = to_float(order.get("filled_quantity") or order.get("filled_size") or "0") * to_float(order.get("price") or order.get("order_price") or "0")
+        except (ValueError, TypeError):
+            continue
+        if vol <= 0:
+            continue
+        # #region agent log
+        if _DEBUG_ENABLED and _parse_dt(order.get("created_at")) is None:
+            _debug_log("H1", "calculator.py:_aggregate_all_orders", "order with missing created_at included in volume", {"vol": vol, "order_id": order.get("order_id", order.get("id", ""))[:24]})
+        # #endregion
+        total_volume += vol
+        order_count += 1
+        raw_sym = order.get("symbol") or order.get("asset_id") or ""
+        sym = symbol_names.get(raw_sym)
+        if sym is None:
+            sym = symbol_names[raw_sym] = sys.intern(str(raw_sym).strip().upper())
+        if sym:
+            by_symbol[sym] += vol
+
+    return total_volume, order_count, dict(by_symbol), source_available
 
 
 class VolumeFeesCalculator:
@@ -229,6 +831,8 @@ class VolumeFeesCalculator:
         client: Any,
         alpha_tier: Union[int, AlphaTier] = 0,
         count_only_api_sourced: bool = True,
+        cache: Optional[ResponseCache] = None,
+        incremental: bool = False,
     ):
         """
         Args:
@@ -236,6 +840,11 @@ class VolumeFeesCalculator:
             alpha_tier: 0 = Non-Alpha (0.05%), 1--6 = Alpha 1--6.
             count_only_api_sourced: If True, only count orders where source is API
                 (when API provides source). If False, count all filled orders in range.
+            cache: Optional ResponseCache; when set, order and fee history responses
+                are reused from disk within its TTL instead of re-fetched.
+            incremental: If True (requires cache), keep the full order history in the
+                cache's cursor and only fetch orders newer than it on each run; time
+                and symbol filters are then applied locally. Ignored when limit is set.
         """
         self._client = client
         # Clamp alpha_tier to 0-6 to avoid ValueError for out-of-range (H4 fix)
@@ -246,7 +855,12 @@ class VolumeFeesCalculator:
         if tier_val != clamped:
             _debug_log("H4", "calculator.py:__init__", "alpha_tier clamped to valid range", {"requested": tier_val, "clamped": clamped})
         # #endregion
+        # Tier is fixed per instance, so resolve its fee rate once
+        self._fee_rate = get_fee_rate(self._alpha_tier)
+        self._fee_rate_frac = self._fee_rate / 100.0
         self._count_only_api_sourced = count_only_api_sourced
+        self._cache = cache
+        self._incremental = incremental
 
     def calculate(
         self,
@@ -269,83 +883,54 @@ class VolumeFeesCalculator:
 
         Returns:
             Dict with: total_volume, estimated_fees, fee_rate_pct, order_count,
-            by_symbol (volume per symbol), source_available (whether source was used),
+            by_symbol (volume per upper-cased symbol), source_available (whether source was used),
             and optionally actual_fees, actual_fee_count when include_actual_fees is True.
         """
         # #region agent log
         _debug_log("H0", "calculator.py:calculate", "calculate() entered", {"since": str(since), "until": str(until), "symbol": symbol, "limit": limit})
         # #endregion
-        raw_orders = fetch_raw_order_history(self._client, limit=limit)
         since_dt = _parse_dt(since) if since else None
         until_dt = _parse_dt(until) if until else None
         symbol_norm = (symbol or "").strip().upper() or None
-        # #region agent log
-        _debug_log("H0", "calculator.py:calculate", "after fetch", {"raw_order_count": len(raw_orders), "since_dt": str(since_dt), "until_dt": str(until_dt)})
-        # #endregion
+        # Orders are streamed into the aggregation (process-and-discard) rather than
+        # collected first, except for incremental runs that merge with the cursor
+        raw_orders: Iterable[Dict[str, Any]]
+        if self._incremental and self._cache is not None and not limit:
+            raw_orders = fetch_incremental_order_history(self._client, self._cache)
+        else:
+            # Fetch on a background thread so aggregation overlaps the HTTP round-trips
+            raw_orders = _prefetch_pages(
+                _iter_order_pages(
+                    self._client,
+                    limit=limit,
+                    since_dt=since_dt,
+                    until_dt=until_dt,
+                    symbol=symbol_norm,
+                    cache=self._cache,
+                )
+            )
 
-        total_volume = 0.0
-        by_symbol: Dict[str, float] = {}
-        order_count = 0
-        source_available = False
-
-        for order in raw_orders:
-            created = _parse_dt(order.get("created_at"))
-            # #region agent log
-            if created is None and order.get("created_at") is not None:
-                _debug_log("H3", "calculator.py:calculate", "order created_at parse returned None", {"order_id": order.get("order_id", order.get("id", ""))[:24]})
-            if created is None and (since_dt or until_dt):
-                _debug_log("H1", "calculator.py:calculate", "order missing created_at with date filter", {"since": str(since_dt), "until": str(until_dt), "order_id": order.get("order_id", order.get("id", ""))[:24]})
-            # #endregion
-            # Exclude orders with missing created_at when date filter is set (H1)
-            if (since_dt or until_dt) and created is None:
-                continue
-            if since_dt and created:
-                try:
-                    if _norm_dt(created) < _norm_dt(since_dt):
-                        continue
-                except TypeError:
-                    pass
-            if until_dt and created:
-                try:
-                    if _norm_dt(created) > _norm_dt(until_dt):
-                        continue
-                except TypeError:
-                    pass
-            sym = (order.get("symbol") or order.get("asset_id") or "").strip()
-            if symbol_norm and sym.upper() != symbol_norm:
-                continue
-            if not _order_is_filled(order):
-                continue
-            if self._count_only_api_sourced and not _is_api_sourced(order):
-                continue  # skip non-API when filtering by source
-            # Track if we ever saw a source-like field
-            for k in SOURCE_KEYS:
-                if order.get(k) is not None:
-                    source_available = True
-                    break
-            vol = _order_volume_contribution(order)
-            if vol <= 0:
-                continue
-            # #region agent log
-            if created is None:
-                _debug_log("H1", "calculator.py:calculate", "order with missing created_at included in volume", {"vol": vol, "order_id": order.get("order_id", order.get("id", ""))[:24]})
-            # #endregion
-            total_volume += vol
-            order_count += 1
-            if sym:
-                by_symbol[sym] = by_symbol.get(sym, 0.0) + vol
-
-        fee_rate = get_fee_rate(self._alpha_tier)
+        if since_dt is None and until_dt is None and symbol_norm is None and not self._count_only_api_sourced:
+            # "Sum everything": specialized loop without the filter branches
+            total_volume, order_count, by_symbol, source_available = _aggregate_all_orders(raw_orders)
+        else:
+            total_volume, order_count, by_symbol, source_available = _aggregate_orders(
+                raw_orders,
+                since_dt,
+                until_dt,
+                symbol_norm,
+                self._count_only_api_sourced,
+            )
         # #region agent log
-        if self._alpha_tier not in FEE_RATES:
-            _debug_log("H4", "calculator.py:calculate", "alpha_tier out of range, using NON_ALPHA", {"tier": int(self._alpha_tier), "fallback_rate": fee_rate})
+        _debug_log("H0", "calculator.py:calculate", "after fetch", {"order_count": order_count, "since_dt": str(since_dt), "until_dt": str(until_dt)})
         # #endregion
-        estimated_fees = total_volume * (fee_rate / 100.0)
+
+        estimated_fees = total_volume * self._fee_rate_frac
 
         result: Dict[str, Any] = {
             "total_volume": total_volume,
             "estimated_fees": estimated_fees,
-            "fee_rate_pct": fee_rate,
+            "fee_rate_pct": self._fee_rate,
             "order_count": order_count,
             "by_symbol": by_symbol,
             "source_available": source_available,
@@ -358,6 +943,7 @@ class VolumeFeesCalculator:
                 since_dt=since_dt,
                 until_dt=until_dt,
                 symbol=symbol_norm,
+                cache=self._cache,
             )
             result["actual_fees"] = actual_fees
             result["actual_fee_count"] = actual_fee_count
@@ -10,10 +10,22 @@ API secret can also be set via MUDREX_API_SECRET.
 """
 
 import argparse
+import heapq
 import os
 import sys
 
 
+def _non_negative_int(value: str) -> int:
+    """argparse type for counts where 0 means "no limit"."""
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or greater, got {n}")
+    return n
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Calculate API volume and estimated fees for Mudrex Futures (docs.trade.mudrex.com)"
@@ -57,6 +69,23 @@ def main() -> int:
         default=None,
         help="Max number of order history records to fetch (default: all)",
     )
+    parser.add_argument(
+        "--top",
+        type=_non_negative_int,
+        default=20,
+        metavar="N",
+        help="Show the N highest-volume symbols (default: 20; 0 = all)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch from the API (skip the on-disk response cache; TTL via MUDREX_VF_CACHE_TTL)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep full order history in the cache and only fetch orders that are new or still open since the last run",
+    )
     args = parser.parse_args()
 
     if not args.api_secret:
@@ -65,7 +94,8 @@ def main() -> int:
 
     try:
         from mudrex import MudrexClient
-        from mudrex_volume_fees import VolumeFeesCalculator
+        from mudrex_volume_fees import ResponseCache, VolumeFeesCalculator
+        from mudrex_volume_fees.cache import account_namespace
     except ImportError as e:
         print(f"Error: {e}. Install: pip install -e .", file=sys.stderr)
         return 1
@@ -75,6 +105,8 @@ def main() -> int:
         client=client,
         alpha_tier=args.alpha_tier,
         count_only_api_sourced=not args.all_volume,
+        cache=None if args.no_cache else ResponseCache(namespace=account_namespace(args.api_secret)),
+        incremental=args.incremental and not args.no_cache,
     )
     report = calc.calculate(
         since=args.since,
@@ -95,10 +127,18 @@ def main() -> int:
     print(f"  Estimated fees: ${report['estimated_fees']:,.2f}")
     if "actual_fees" in report:
         print(f"  Actual fees (from API): ${report['actual_fees']:,.2f} ({report.get('actual_fee_count', 0)} records)")
-    if report.get("by_symbol"):
+    by_symbol = report.get("by_symbol") or {}
+    if by_symbol:
         print("  By symbol:")
-        for sym, vol in sorted(report["by_symbol"].items(), key=lambda x: -x[1]):
+        if args.top:
+            # Partial selection: O(n log k) instead of sorting every symbol
+            top = heapq.nlargest(args.top, by_symbol.items(), key=lambda x: x[1])
+        else:
+            top = sorted(by_symbol.items(), key=lambda x: -x[1])
+        for sym, vol in top:
             print(f"    {sym}: ${vol:,.2f}")
+        if len(top) < len(by_symbol):
+            print(f"    ... {len(by_symbol) - len(top)} more (use --top 0 to show all)")
     if not report.get("source_available"):
         print("  Note: Order source not in API response; all filled orders in range were counted.")
     if (args.since or args.until) and report["order_count"] == 0:
@@ -1,85 +1,599 @@
 #!/usr/bin/env python3
 """
 Local edge-case test: runs the calculator with a mock client so we can
-trigger H1/H2/H3/H4/H7 without a real API secret. Writes to .cursor/debug.log.
+trigger H1/H2/H3/H4/H7 without a real API secret. Run with MUDREX_VF_DEBUG=1
+to write the debug trail to .cursor/debug.log (or set MUDREX_VF_DEBUG_LOG=path).
+
+As tests: python -m pytest test_edge_cases_local.py (one case per hypothesis;
+the calculator and its filtered report are built once per module). Generated
+order batches (gen_orders) cover empty, invalid-only, multi-page and 100k-order
+histories against the same checks, and unfiltered against the general
+aggregation kernel; dated newest-first histories cover paging,
+limit, early stop, fetch errors, the response cache and the incremental
+cursor. The module does not import pytest, so
+running it as a script works without the dev extra.
 """
 
-from datetime import datetime
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, Optional, Union
+
+from mudrex_volume_fees import ResponseCache, VolumeFeesCalculator, _json
+from mudrex_volume_fees.calculator import (
+    IST,
+    _aggregate_orders,
+    _fetch_actual_fees,
+    _iter_order_pages,
+    _parse_dt,
+    _prefetch_pages,
+    fetch_incremental_order_history,
+    fetch_raw_order_history,
+)
+
+# Order created_at values are ISO strings, as the API sends them; fee records
+# (SDK objects) carry a datetime, pre-parsed at import
+_ORDER_1_AT = "2025-01-15T12:00:00Z"
+_ORDER_3_AT = "2025-01-20T00:00:00"
+_T_FEE_1 = datetime(2025, 1, 15, 12, 1, 0, tzinfo=timezone.utc)
+
+
+# Canned API payloads, built once at import; the mock returns them by lookup
+_ORDERS_PAGE_1 = {
+    "data": {
+        "items": [
+            {
+                "order_id": "ord-1",
+                "symbol": "BTCUSDT",
+                "status": "FILLED",
+                "filled_quantity": "0.001",
+                "price": "50000",
+                "created_at": _ORDER_1_AT,
+                "source": "API",
+            },
+            {
+                "order_id": "ord-2",
+                "symbol": "ETHUSDT",
+                "status": "FILLED",
+                "filled_quantity": "0.1",
+                "price": "3000",
+                "created_at": None,  # missing -> H1
+            },
+            {
+                "order_id": "ord-3",
+                "symbol": "BTCUSDT",
+                "status": "OPEN",
+                "filled_quantity": "0",
+                "price": "50000",
+                "created_at": _ORDER_3_AT,
+            },
+        ]
+    }
+}
+_ORDERS_EMPTY = {"data": {"items": []}}
+_ORDERS_PAGES = {1: _ORDERS_PAGE_1}
+
+_ODD_STATUSES = ("CANCELLED", "REJECTED", "", None)
+
+
+def gen_orders(n_valid: int, n_missing_ts: int = 0, n_open: int = 0, n_odd_status: int = 0) -> List[dict]:
+    """
+    Order items for a generated history: n_valid filled API BTCUSDT orders of
+    50 USDT each inside January 2025; the rest must all be excluded (missing
+    created_at -> H1, OPEN/unfilled, or a non-filled status).
+    """
+    valid = [
+        {"order_id": f"v-{i}", "symbol": "BTCUSDT", "status": "FILLED", "filled_quantity": "0.001",
+         "price": "50000", "created_at": _ORDER_1_AT, "source": "API"}
+        for i in range(n_valid)
+    ]
+    missing_ts = [
+        {"order_id": f"m-{i}", "symbol": "ETHUSDT", "status": "FILLED", "filled_quantity": "0.1",
+         "price": "3000", "created_at": None, "source": "API"}
+        for i in range(n_missing_ts)
+    ]
+    open_ = [
+        {"order_id": f"o-{i}", "symbol": "BTCUSDT", "status": "OPEN", "filled_quantity": "0",
+         "price": "50000", "created_at": _ORDER_3_AT, "source": "API"}
+        for i in range(n_open)
+    ]
+    odd = [
+        {"order_id": f"x-{i}", "symbol": "BTCUSDT", "status": _ODD_STATUSES[i % len(_ODD_STATUSES)],
+         "filled_quantity": "0.001", "price": "50000", "created_at": _ORDER_1_AT, "source": "API"}
+        for i in range(n_odd_status)
+    ]
+    return valid + missing_ts + open_ + odd
+
+
+_NEWEST_AT = datetime(2025, 1, 31, 0, 0, 0, tzinfo=timezone.utc)
+
+
+def dated_orders(n: int, prefix: str = "d") -> List[dict]:
+    """n filled API orders, newest first, one hour apart back from _NEWEST_AT."""
+    return [
+        {"order_id": f"{prefix}-{i}", "symbol": "BTCUSDT", "status": "FILLED", "filled_quantity": "0.001",
+         "price": "50000", "created_at": (_NEWEST_AT - timedelta(hours=i)).isoformat(), "source": "API"}
+        for i in range(n)
+    ]
+
+
+# orders/history item fields as the API sends them: name -> accepted types
+_ORDER_FIELDS = {
+    "order_id": (str,),
+    "symbol": (str,),
+    "status": (str, type(None)),
+    "filled_quantity": (str,),
+    "price": (str,),
+    "created_at": (str, type(None)),
+}
+_OPTIONAL_ORDER_FIELDS = {"source": (str,)}
+
+
+def _validate_order_items(items: List[dict]) -> None:
+    """Raise ValueError if any mock order item drifts from the API item shape."""
+    for item in items:
+        missing = _ORDER_FIELDS.keys() - item.keys()
+        unknown = item.keys() - _ORDER_FIELDS.keys() - _OPTIONAL_ORDER_FIELDS.keys()
+        if missing or unknown:
+            raise ValueError(f"mock order {item.get('order_id')!r}: missing {sorted(missing)}, unknown {sorted(unknown)}")
+        for key, value in item.items():
+            types = _ORDER_FIELDS.get(key) or _OPTIONAL_ORDER_FIELDS[key]
+            if not isinstance(value, types):
+                raise ValueError(f"mock order {item['order_id']!r}: {key}={value!r} is {type(value).__name__}")
+
+
+# Checked once at import: the canned pages, plus one item of every generated kind
+for _resp in _ORDERS_PAGES.values():
+    _validate_order_items(_resp["data"]["items"])
+_validate_order_items(gen_orders(1, 1, 1, len(_ODD_STATUSES)))
+_validate_order_items(dated_orders(1))
+
+# Serialized once at import and decoded per request (orjson when installed), so
+# the mock hands the calculator freshly parsed JSON like the real HTTP client
+_ORDERS_EMPTY_BYTES = _json.dumps(_ORDERS_EMPTY)
+_ORDERS_PAGES_BYTES = {page: _json.dumps(resp) for page, resp in _ORDERS_PAGES.items()}
+
+
+@dataclass(frozen=True)
+class MockFee:
+    """Fee record with .created_at/.fee_amount like the SDK's; slotted (no __dict__)."""
+
+    __slots__ = ("fee_amount", "created_at")
+    fee_amount: str
+    created_at: Optional[Union[datetime, str]]
+
+
+def make_fees(n: int, created_at: Optional[Union[datetime, str]] = _T_FEE_1) -> List[MockFee]:
+    """n identical-shape fee records for scaled-up fee history runs."""
+    return [MockFee(f"{(i % 100) / 100:.2f}", created_at) for i in range(n)]
+
+
+# Shared immutable fee history; get_history returns it (or a slice) as is
+_FEES = (
+    MockFee("0.25", _T_FEE_1),
+    MockFee("0.10", None),  # missing -> H7
+)
 
 
 class MockClient:
-    """Minimal client that returns controlled order/fee history."""
+    """
+    Minimal client that returns controlled order/fee history: the canned page 1
+    by default, or the given orders served page/per_page at a time (with a
+    "total" count when with_total is set). Order history params are recorded
+    in .requests.
+    """
+
+    __slots__ = ("_orders", "_with_total", "_page_bytes", "requests", "fees")
+
+    def __init__(self, orders: Optional[List[dict]] = None, with_total: bool = False):
+        self._orders = orders
+        self._with_total = with_total
+        self._page_bytes = {}  # (page, per_page) -> serialized page of self._orders
+        self.requests: List[dict] = []
+        self.fees = self  # client.fees.get_history -> self.get_history
 
     def get(self, endpoint: str, params: dict):
         if "orders/history" in endpoint:
-            # Page 1: mix of valid, missing created_at, and odd data
+            self.requests.append(dict(params))
             page = params.get("page", 1)
-            if page == 1:
-                return {
-                    "data": {
-                        "items": [
-                            {
-                                "order_id": "ord-1",
-                                "symbol": "BTCUSDT",
-                                "status": "FILLED",
-                                "filled_quantity": "0.001",
-                                "price": "50000",
-                                "created_at": "2025-01-15T12:00:00Z",
-                                "source": "API",
-                            },
-                            {
-                                "order_id": "ord-2",
-                                "symbol": "ETHUSDT",
-                                "status": "FILLED",
-                                "filled_quantity": "0.1",
-                                "price": "3000",
-                                "created_at": None,  # missing -> H1
-                            },
-                            {
-                                "order_id": "ord-3",
-                                "symbol": "BTCUSDT",
-                                "status": "OPEN",
-                                "filled_quantity": "0",
-                                "price": "50000",
-                                "created_at": "2025-01-20T00:00:00",
-                            },
-                        ]
-                    }
-                }
-            return {"data": {"items": []}}
-
-    @property
-    def fees(self):
-        return self
+            if self._orders is None:
+                # Page 1: mix of valid, missing created_at, and odd data
+                return _json.loads(_ORDERS_PAGES_BYTES.get(page, _ORDERS_EMPTY_BYTES))
+            per_page = params.get("per_page", 100)
+            key = (page, per_page)
+            data = self._page_bytes.get(key)
+            if data is None:
+                resp = {"items": self._orders[(page - 1) * per_page : page * per_page]}
+                if self._with_total:
+                    resp["total"] = len(self._orders)
+                data = self._page_bytes[key] = _json.dumps({"data": resp})
+            return _json.loads(data)
+        return None
 
     def get_history(self, limit=None, symbol=None):
-        # Fee with missing created_at -> H7 (use simple objects with .created_at, .fee_amount)
-        class F:
-            pass
-        f1, f2 = F(), F()
-        f1.fee_amount = "0.25"
-        f1.created_at = "2025-01-15T12:01:00Z"
-        f2.fee_amount = "0.10"
-        f2.created_at = None  # missing -> H7
-        return [f1, f2]
+        return _FEES[:limit] if limit else _FEES
 
 
-def main():
-    from mudrex_volume_fees import VolumeFeesCalculator
+class FailingClient(MockClient):
+    """MockClient whose order history request for fail_page raises RuntimeError."""
+
+    __slots__ = ("_fail_page",)
+
+    def __init__(self, orders: List[dict], fail_page: int):
+        super().__init__(orders)
+        self._fail_page = fail_page
+
+    def get(self, endpoint: str, params: dict):
+        if params.get("page") == self._fail_page:
+            raise RuntimeError(f"page {self._fail_page} failed")
+        return super().get(endpoint, params)
+
+
+class FeeHistoryClient(MockClient):
+    """MockClient serving the given fee history; each get_history call is recorded in .fee_requests."""
+
+    __slots__ = ("_fee_history", "fee_requests")
+
+    def __init__(self, fees=_FEES):
+        super().__init__()
+        self._fee_history = fees
+        self.fee_requests: List[dict] = []
+
+    def get_history(self, limit=None, symbol=None):
+        self.fee_requests.append({"limit": limit, "symbol": symbol})
+        return self._fee_history[:limit] if limit else self._fee_history
+
+
+# Keys every filtered report with include_actual_fees=True must carry; checked
+# with one set operation instead of per-key membership tests
+_EXPECTED_REPORT_KEYS = frozenset({
+    "total_volume",
+    "estimated_fees",
+    "fee_rate_pct",
+    "order_count",
+    "by_symbol",
+    "source_available",
+    "actual_fees",
+    "actual_fee_count",
+})
+
 
-    client = MockClient()
-    calc = VolumeFeesCalculator(client=client, alpha_tier=2, count_only_api_sourced=True)
-    report = calc.calculate(
+def _run(calc):
+    return calc.calculate(
         since="2025-01-01",
         until="2025-01-31",
         symbol=None,
         limit=50,
         include_actual_fees=True,
     )
+
+
+@lru_cache(maxsize=None)
+def _shared_calc():
+    """Calculator over the canned page, built once and shared by the H* checks."""
+    return VolumeFeesCalculator(client=MockClient(), alpha_tier=2, count_only_api_sourced=True)
+
+
+@lru_cache(maxsize=None)
+def _shared_report():
+    return _run(_shared_calc())
+
+
+def _check_h1(calc, report):
+    # Order with missing created_at is excluded when a date filter is set
+    assert "ETHUSDT" not in report["by_symbol"]
+    assert report["order_count"] == 1
+
+
+def _check_h2(calc, report):
+    # {"data": {"items": [...]}} page shape is unwrapped into order dicts
+    assert len(fetch_raw_order_history(MockClient())) == 3
+    assert report["total_volume"] == 50.0
+
+
+def _check_h3(calc, report):
+    # Empty/zero created_at inputs parse without raising; "Z" ISO strings are
+    # UTC and naive ones IST; unfilled orders do not count
+    assert _parse_dt("") is None
+    assert _parse_dt(0) is not None
+    assert _parse_dt(_ORDER_1_AT) == datetime(2025, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+    assert _parse_dt(_ORDER_3_AT) == datetime(2025, 1, 20, 0, 0, 0, tzinfo=IST)
+    # Strings that pass the numeric precheck but are not numbers parse to None
+    for value in ("2025-01", "1-2", "12-", "2025-0115"):
+        assert _parse_dt(value) is None
+    # ...so such a since is no filter at all: both filled orders count, no raise
+    assert calc.calculate(since="2025-01", include_actual_fees=False)["order_count"] == 2
+    assert report["by_symbol"] == {"BTCUSDT": 50.0}
+
+
+def _check_h4(calc, report):
+    # Out-of-range alpha tiers are clamped to 0-6
+    assert report["fee_rate_pct"] == 0.045
+    assert VolumeFeesCalculator(client=MockClient(), alpha_tier=9).calculate()["fee_rate_pct"] == 0.030
+    assert VolumeFeesCalculator(client=MockClient(), alpha_tier=-1).calculate()["fee_rate_pct"] == 0.05
+
+
+def _check_h7(calc, report):
+    # Fee with missing created_at is excluded when a date filter is set
+    assert report["actual_fees"] == 0.25
+    assert report["actual_fee_count"] == 1
+
+
+_CHECKS = {"H1": _check_h1, "H2": _check_h2, "H3": _check_h3, "H4": _check_h4, "H7": _check_h7}
+
+
+def test_edge_case(scenario_id):
+    _CHECKS[scenario_id](_shared_calc(), _shared_report())
+
+
+def test_scaled_h7_fee_history():
+    # H7 at scale: make_fees records served through get_history; the ones
+    # missing created_at are excluded under a date filter
+    n = 10000
+    client = FeeHistoryClient(make_fees(n) + make_fees(100, created_at=None))
+    report = VolumeFeesCalculator(client=client).calculate(since="2025-01-01", until="2025-01-31")
+    assert report["actual_fee_count"] == n
+    assert abs(report["actual_fees"] - 49.5 * n / 100) < 1e-6
+
+
+def test_report_keys():
+    assert not _EXPECTED_REPORT_KEYS - _shared_report().keys()
+
+
+# (n_valid, n_missing_ts, n_open, n_odd_status); "tle" is large enough that a
+# non-linear pass over the orders would show up as a timeout
+_GENERATED = {
+    "empty": (0, 0, 0, 0),
+    "invalid_only": (0, 3, 3, 4),
+    "mixed": (5, 2, 3, 4),
+    "multi_page": (250, 10, 10, 10),
+    "tle": (100000, 10, 10, 10),
+}
+
+
+def test_generated_orders(case):
+    n_valid, n_missing_ts, n_open, n_odd_status = _GENERATED[case]
+    client = MockClient(orders=gen_orders(n_valid, n_missing_ts, n_open, n_odd_status))
+    report = VolumeFeesCalculator(client=client, alpha_tier=2).calculate(since="2025-01-01", until="2025-01-31")
+    assert report["order_count"] == n_valid
+    assert report["total_volume"] == 50.0 * n_valid
+    assert report["by_symbol"] == ({"BTCUSDT": 50.0 * n_valid} if n_valid else {})
+    assert len(fetch_raw_order_history(client)) == n_valid + n_missing_ts + n_open + n_odd_status
+
+
+def test_generated_orders_unfiltered(case):
+    # No filters and all volume: calculate() takes the specialized
+    # _aggregate_all_orders loop, which must match the general kernel
+    orders = gen_orders(*_GENERATED[case])
+    for batch in (orders, [{k: v for k, v in o.items() if k != "source"} for o in orders]):
+        report = VolumeFeesCalculator(client=MockClient(orders=batch), count_only_api_sourced=False).calculate(
+            include_actual_fees=False
+        )
+        total_volume, order_count, by_symbol, source_available = _aggregate_orders(batch, None, None, None, False)
+        assert report["total_volume"] == total_volume
+        assert report["order_count"] == order_count
+        assert report["by_symbol"] == by_symbol
+        assert report["source_available"] is source_available
+        # Orders missing created_at count here, unlike with a time filter
+        assert order_count == _GENERATED[case][0] + _GENERATED[case][1]
+
+
+def _pages(client):
+    return sorted({params["page"] for params in client.requests})
+
+
+def test_paging_with_total_metadata():
+    # total known from page 1: exactly the pages it implies, in order
+    orders = dated_orders(250)
+    client = MockClient(orders, with_total=True)
+    assert fetch_raw_order_history(client) == orders
+    assert _pages(client) == [1, 2, 3]
+
+
+def test_paging_without_metadata():
+    # No total: doubling windows until a short/empty page; order preserved. A
+    # full last page needs one empty page to confirm the end (later pages of
+    # that window may be requested too)
+    for n, first_pages in ((250, [1, 2, 3]), (300, [1, 2, 3, 4])):
+        orders = dated_orders(n)
+        client = MockClient(orders)
+        assert fetch_raw_order_history(client) == orders
+        assert _pages(client)[: len(first_pages)] == first_pages
+
+
+def test_limit_truncates_and_stops_paging():
+    orders = dated_orders(1000)
+    for with_total in (True, False):
+        client = MockClient(orders, with_total=with_total)
+        assert fetch_raw_order_history(client, limit=150) == orders[:150]
+        assert _pages(client) == [1, 2]
+
+
+def test_newest_first_early_stop_on_since():
+    # The mock ignores start_time, so this is the client-side stop: page 2 ends
+    # before since, so later pages are never needed
+    client = MockClient(dated_orders(1000))
+    since = _NEWEST_AT - timedelta(hours=150)
+    report = VolumeFeesCalculator(client=client).calculate(since=since, include_actual_fees=False)
+    assert report["order_count"] == 151
+    assert max(_pages(client)) <= 3
+    assert all(params["start_time"] == int(since.timestamp() * 1000) for params in client.requests)
+
+
+def test_no_early_stop_on_unsorted_page():
+    # Page 2 is out of order only in the middle (its first and last rows are
+    # still newest first), and page 3 holds an order inside the range: neither
+    # page may stop pagination, so that order still counts
+    orders = dated_orders(1000)
+    orders[150] = dict(orders[150], created_at=(_NEWEST_AT + timedelta(hours=1)).isoformat())
+    orders[250] = dict(orders[250], created_at=(_NEWEST_AT - timedelta(hours=50)).isoformat())
+    client = MockClient(orders)
+    since = _NEWEST_AT - timedelta(hours=150)
+    report = VolumeFeesCalculator(client=client).calculate(since=since, include_actual_fees=False)
+    assert report["order_count"] == 152
+    assert 4 in _pages(client)
+
+
+def test_producer_exception_is_reraised():
+    client = FailingClient(dated_orders(500), fail_page=2)
+    try:
+        list(_prefetch_pages(_iter_order_pages(client)))
+    except RuntimeError as exc:
+        assert str(exc) == "page 2 failed"
+    else:
+        raise AssertionError("producer exception was swallowed")
+    try:
+        VolumeFeesCalculator(client=client).calculate(include_actual_fees=False)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("calculate() swallowed the fetch error")
+
+
+def test_cache_hit_and_expiry(tmp_path):
+    orders = dated_orders(250)
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    assert fetch_raw_order_history(MockClient(orders), cache=cache) == orders
+    # Hit: the whole history comes from one entry, even after new orders arrive
+    newer = dated_orders(5, prefix="new") + orders
+    client = MockClient(newer)
+    assert fetch_raw_order_history(client, cache=cache) == orders
+    assert client.requests == []
+    # Same filters + limit only: a different limit is a different entry
+    assert fetch_raw_order_history(client, limit=100, cache=cache) == newer[:100]
+    # Expired: fetched again
+    client = MockClient(newer)
+    assert fetch_raw_order_history(client, cache=ResponseCache(cache_dir=str(tmp_path), ttl=-1)) == newer
+    assert client.requests
+
+
+def test_cache_skips_partial_fetch(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    pages = _iter_order_pages(MockClient(dated_orders(250)), cache=cache)
+    next(pages)
+    pages.close()
+    client = MockClient(dated_orders(250))
+    assert len(fetch_raw_order_history(client, cache=cache)) == 250
+    assert client.requests
+
+
+def test_cache_entry_without_numeric_ts_is_a_miss(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    orders = dated_orders(50)
+    fetch_raw_order_history(MockClient(orders), cache=cache)
+    (entry,) = [path for path in tmp_path.rglob("*.json") if path.name != "cursor.json"]
+    for ts in (None, "1700000000", [1]):
+        entry.write_bytes(_json.dumps({"ts": ts, "data": []}))
+        client = MockClient(orders)
+        assert fetch_raw_order_history(client, cache=cache) == orders
+        assert client.requests
+
+
+def test_fee_cache_miss_and_hit_match(tmp_path):
+    # Without a cache SDK datetimes are compared directly; with one, fees become
+    # ISO records on the miss and are parsed back on the hit. All must agree
+    uncached = VolumeFeesCalculator(client=FeeHistoryClient()).calculate(since="2025-01-01", until="2025-01-31")
+    client = FeeHistoryClient()
+    calc = VolumeFeesCalculator(client=client, cache=ResponseCache(cache_dir=str(tmp_path), ttl=3600))
+    miss = calc.calculate(since="2025-01-01", until="2025-01-31")
+    hit = calc.calculate(since="2025-01-01", until="2025-01-31")
+    for report in (uncached, miss, hit):
+        assert (report["actual_fees"], report["actual_fee_count"]) == (0.25, 1)
+    assert len(client.fee_requests) == 1
+    # A different since is a separate entry, fetched again (the fee is before it)
+    later = calc.calculate(since="2025-01-16", until="2025-01-31")
+    assert (later["actual_fees"], later["actual_fee_count"]) == (0.0, 0)
+    assert len(client.fee_requests) == 2
+
+
+def test_fee_cache_entry_not_a_list_is_a_miss(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    expected = _fetch_actual_fees(MockClient(), cache=cache)
+    (entry,) = tmp_path.rglob("*.json")
+    for data in ({"a": 1, "b": 2}, "ab"):
+        entry.write_bytes(_json.dumps({"ts": time.time(), "data": data}))
+        assert _fetch_actual_fees(MockClient(), cache=cache) == expected == (0.35, 2)
+
+
+def test_cache_shared_across_symbols(tmp_path):
+    # symbol is filtered locally, so switching it reuses the cached history
+    orders = [dict(o, symbol="ETHUSDT") if i % 2 else o for i, o in enumerate(dated_orders(250))]
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    client = MockClient(orders)
+    calc = VolumeFeesCalculator(client=client, cache=cache)
+    reports = [calc.calculate(symbol=symbol, include_actual_fees=False) for symbol in (None, "BTCUSDT", "ethusdt")]
+    assert _pages(client) == [1, 2, 3]
+    assert len(client.requests) == 3
+    assert all("symbol" not in params for params in client.requests)
+    assert [report["order_count"] for report in reports] == [250, 125, 125]
+    assert reports[2]["by_symbol"] == {"ETHUSDT": 125 * 50.0}
+    # The shared entry still gives fetch_raw_order_history only the asked
+    # symbol, on a miss (fresh cache) and on a hit
+    eth = [o for o in orders if o["symbol"] == "ETHUSDT"]
+    fresh = ResponseCache(cache_dir=str(tmp_path / "fresh"), ttl=3600)
+    assert fetch_raw_order_history(MockClient(orders), symbol="ethusdt", cache=fresh) == eth
+    assert fetch_raw_order_history(client, symbol="ETHUSDT", cache=fresh) == eth
+    assert fetch_raw_order_history(client, cache=fresh) == orders
+    assert len(client.requests) == 3
+
+
+def test_incremental_cursor_merge(tmp_path):
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    old = dated_orders(150)
+    old[120] = dict(old[120], status="OPEN", filled_quantity="0")
+    assert fetch_incremental_order_history(MockClient(old), cache) == old
+    assert cache.load_cursor()["orders"] == old
+
+    # Five new orders, and the open order has filled since the last run
+    now = dated_orders(5, prefix="new") + [dict(o) for o in old]
+    now[125] = dict(old[120], status="FILLED", filled_quantity="0.001")
+    client = MockClient(now)
+    merged = fetch_incremental_order_history(client, cache)
+    # Re-fetched from the oldest non-terminal order, not just the high-water mark
+    assert client.requests[0]["start_time"] == int((_NEWEST_AT - timedelta(hours=120)).timestamp() * 1000)
+    ids = [o["order_id"] for o in merged]
+    assert len(ids) == len(set(ids)) == 155
+    assert next(o for o in merged if o["order_id"] == "d-120")["status"] == "FILLED"
+
+    # Everything terminal now: next run starts at the high-water mark
+    client = MockClient(now)
+    assert len(fetch_incremental_order_history(client, cache)) == 155
+    assert client.requests[0]["start_time"] == int(_NEWEST_AT.timestamp() * 1000)
+
+
+def test_incremental_dedupes_shifted_pages(tmp_path):
+    # A page shift repeats d-199 at the start of page 3; it sits far older than
+    # the later re-fetch windows, so only a dedupe of the fetch itself drops it
+    orders = dated_orders(300)
+    orders.insert(200, dict(orders[199]))
+    cache = ResponseCache(cache_dir=str(tmp_path), ttl=3600)
+    calc = VolumeFeesCalculator(client=MockClient(orders), cache=cache, incremental=True)
+    for _ in range(3):
+        assert calc.calculate(include_actual_fees=False)["order_count"] == 300
+        assert len(cache.load_cursor()["orders"]) == 300
+
+
+# Test argument name -> cases (dict keys become the test ids)
+_PARAMETERS = {"scenario_id": _CHECKS, "case": _GENERATED}
+
+
+def pytest_generate_tests(metafunc):
+    """Parametrize the tests above from _PARAMETERS (hook instead of importing pytest)."""
+    for name, cases in _PARAMETERS.items():
+        if name in metafunc.fixturenames:
+            metafunc.parametrize(name, sorted(cases))
+
+
+def main():
+    report = _run(VolumeFeesCalculator(client=MockClient(), alpha_tier=2, count_only_api_sourced=True))
     print("Report:", report)
     print("total_volume:", report["total_volume"])
     print("order_count:", report["order_count"])
     print("actual_fees" in report and report.get("actual_fees"))
+    missing = _EXPECTED_REPORT_KEYS - report.keys()
+    if missing:
+        print("missing report keys:", sorted(missing))
 
 
 if __name__ == "__main__":
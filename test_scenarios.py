@@ -6,32 +6,118 @@ Run three volume/fees test scenarios:
 2. Open via API + you close manually (app/web)
 3. Open with SL/TP via API + you change SL/TP in app and close
 
+The scenarios use different symbols, so their orders are placed concurrently;
+one open-positions snapshot then serves all of them.
 Uses MUDREX_API_SECRET from env. Run from repo root.
+
+With --mock (or MUDREX_MOCK=1) the scenarios run against an in-memory
+FakeClient instead: no secret, no network, no real trades (for CI).
+
+Report lines go through the "scenarios" logger: output is buffered and written
+to stdout once at the end of the run; errors go to stderr as they happen.
 """
+import itertools
+import logging
+import logging.handlers
 import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+from types import SimpleNamespace
 
+log = logging.getLogger("scenarios")
 
-def main():
-    secret = os.environ.get("MUDREX_API_SECRET")
-    if not secret:
-        print("Set MUDREX_API_SECRET", file=sys.stderr)
-        return 1
+# SL/TP for scenario 3: 0.5x / 2x market price, 4 decimal places (exact decimal math)
+_PRICE_STEP = Decimal("0.0001")
+_SL_FACTOR = Decimal("0.5")
+_TP_FACTOR = Decimal("2")
 
-    from mudrex import MudrexClient
+# Scenario 3 order size, and the exchange's minimum order value (USDT) below
+# which that order would be rejected anyway
+_SCENARIO3_QTY = Decimal("500")
+MIN_NOTIONAL_USDT = Decimal("5")
 
-    client = MudrexClient(api_secret=secret)
+# Seconds a fetched futures balance is reused within this process
+BALANCE_TTL = 30.0
+_balance_cache = None  # (client, fetched_at monotonic, balance)
 
-    try:
-        fut = client.wallet.get_futures_balance()
-        print(f"Futures balance: {fut.balance} USDT\n")
-    except Exception as e:
-        print(f"Balance check failed: {e}", file=sys.stderr)
-        return 1
 
-    # --- Scenario 1: Open via API, close via API ---
-    print("=== Scenario 1: Open via API + close via API ===")
+# Asset prices served by FakeClient
+_MOCK_PRICES = {"DOGEUSDT": "0.35", "XRPUSDT": "2.10", "ARPAUSDT": "0.05"}
+
+
+class FakeClient:
+    """
+    In-memory stand-in for MudrexClient covering the calls these scenarios make.
+    Market orders open a position immediately; close removes it. Thread-safe.
+    """
+
+    def __init__(self, balance="100.00"):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._positions = []
+        self.wallet = SimpleNamespace(get_futures_balance=lambda: SimpleNamespace(balance=balance))
+        self.assets = SimpleNamespace(get=self._get_asset)
+        self.orders = SimpleNamespace(create_market_order=self._create_market_order)
+        self.positions = SimpleNamespace(list_open=self._list_open, close=self._close)
+
+    def _get_asset(self, symbol):
+        return SimpleNamespace(symbol=symbol, price=_MOCK_PRICES.get(symbol, "0.05"))
+
+    def _create_market_order(self, symbol, side, quantity, leverage, **kwargs):
+        with self._lock:
+            n = next(self._ids)
+            self._positions.append(SimpleNamespace(symbol=symbol, position_id=f"mock-pos-{n}", quantity=quantity))
+        return SimpleNamespace(order_id=f"mock-ord-{n}")
+
+    def _list_open(self):
+        with self._lock:
+            return list(self._positions)
+
+    def _close(self, position_id):
+        with self._lock:
+            self._positions = [p for p in self._positions if p.position_id != position_id]
+
+
+@lru_cache(maxsize=256)
+def get_asset(client, symbol):
+    """Asset metadata, fetched once per (client, symbol) per process."""
+    return client.assets.get(symbol)
+
+
+def get_futures_balance(client):
+    """Futures balance, reused for BALANCE_TTL seconds for the same client."""
+    global _balance_cache
+    now = time.monotonic()
+    if _balance_cache is not None and _balance_cache[0] is client and now - _balance_cache[1] < BALANCE_TTL:
+        return _balance_cache[2]
+    balance = client.wallet.get_futures_balance()
+    _balance_cache = (client, now, balance)
+    return balance
+
+
+def wait_until(client, predicate, timeout=5.0, interval=0.2):
+    """
+    Poll open positions until predicate(positions) is true or timeout (seconds)
+    passes; returns the last positions list either way.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        positions = client.positions.list_open()
+        if predicate(positions) or time.monotonic() >= deadline:
+            return positions
+        time.sleep(interval)
+
+
+def run_scenario1(client):
+    """
+    Open via API (closed via API later from the shared snapshot).
+    Returns (report lines, symbol opened or None).
+    """
+    out = ["=== Scenario 1: Open via API + close via API ==="]
     try:
         order1 = client.orders.create_market_order(
             symbol="DOGEUSDT",
@@ -39,25 +125,16 @@ def main():
             quantity="50",
             leverage="2",
         )
-        print(f"  Opened DOGEUSDT LONG 50 @ 2x order_id={order1.order_id}")
+        out.append(f"  Opened DOGEUSDT LONG 50 @ 2x order_id={order1.order_id}")
     except Exception as e:
-        print(f"  Open failed: {e}", file=sys.stderr)
-    else:
-        time.sleep(4)
-        positions = client.positions.list_open()
-        # Close the first DOGE position (the one we just opened if only one)
-        for pos in positions:
-            if pos.symbol == "DOGEUSDT":
-                try:
-                    client.positions.close(pos.position_id)
-                    print(f"  Closed via API: position_id={pos.position_id}")
-                    break
-                except Exception as e:
-                    print(f"  Close failed: {e}", file=sys.stderr)
-        time.sleep(1.5)
-
-    # --- Scenario 2: Open via API, you close manually ---
-    print("\n=== Scenario 2: Open via API + you close manually ===")
+        log.error("  Scenario 1: open failed: %s", e)
+        return out, None
+    return out, "DOGEUSDT"
+
+
+def run_scenario2(client):
+    """Open via API; the user closes manually. Returns (report lines, symbol or None)."""
+    out = ["=== Scenario 2: Open via API + you close manually ==="]
     try:
         order2 = client.orders.create_market_order(
             symbol="XRPUSDT",
@@ -65,38 +142,143 @@ def main():
             quantity="10",
             leverage="2",
         )
-        print(f"  Opened XRPUSDT LONG 10 @ 2x order_id={order2.order_id}")
-        print("  -> Close this position manually in Mudrex app/web.")
+        out.append(f"  Opened XRPUSDT LONG 10 @ 2x order_id={order2.order_id}")
+        out.append("  -> Close this position manually in Mudrex app/web.")
     except Exception as e:
-        print(f"  Open failed: {e}", file=sys.stderr)
-    time.sleep(1.5)
+        log.error("  Scenario 2: open failed: %s", e)
+        return out, None
+    return out, "XRPUSDT"
 
-    # --- Scenario 3: Open with SL/TP via API, you change SL/TP and close ---
-    print("\n=== Scenario 3: Open with SL/TP via API, you change SL/TP and close ===")
+
+def run_scenario3(client):
+    """
+    Open with SL/TP via API; the user edits SL/TP and closes.
+    Returns (report lines, symbol or None).
+    """
+    out = ["=== Scenario 3: Open with SL/TP via API, you change SL/TP and close ==="]
     try:
         # Use ARPAUSDT with amount to meet min order value; SL/TP far from market
-        asset = client.assets.get("ARPAUSDT")
-        price = float(asset.price or 0.05)
-        sl = f"{price * 0.5:.4f}"
-        tp = f"{price * 2.0:.4f}"
+        asset = get_asset(client, "ARPAUSDT")
+        if not asset.price:
+            # No price to size the order or its SL/TP from; do not trade on a guess
+            out.append("  Skipped: ARPAUSDT has no price")
+            return out, None
+        price = Decimal(str(asset.price))
+        notional = price * _SCENARIO3_QTY
+        if notional < MIN_NOTIONAL_USDT:
+            out.append(f"  Skipped: ARPAUSDT {_SCENARIO3_QTY} @ {price} = {notional} USDT is below the {MIN_NOTIONAL_USDT} USDT minimum")
+            return out, None
+        sl = str((price * _SL_FACTOR).quantize(_PRICE_STEP, rounding=ROUND_HALF_EVEN))
+        tp = str((price * _TP_FACTOR).quantize(_PRICE_STEP, rounding=ROUND_HALF_EVEN))
         order3 = client.orders.create_market_order(
             symbol="ARPAUSDT",
             side="LONG",
-            quantity="500",
+            quantity=str(_SCENARIO3_QTY),
             leverage="2",
             stoploss_price=sl,
             takeprofit_price=tp,
         )
-        print(f"  Opened ARPAUSDT LONG 500 @ 2x with SL={sl} TP={tp} order_id={order3.order_id}")
-        print("  -> In app: change SL/TP if you like, then close the position manually.")
+        out.append(f"  Opened ARPAUSDT LONG {_SCENARIO3_QTY} @ 2x with SL={sl} TP={tp} order_id={order3.order_id}")
+        out.append("  -> In app: change SL/TP if you like, then close the position manually.")
+    except Exception as e:
+        log.error("  Scenario 3: open failed: %s", e)
+        return out, None
+    return out, "ARPAUSDT"
+
+
+SCENARIOS = (run_scenario1, run_scenario2, run_scenario3)
+
+
+def close_via_api(client, pos, out):
+    """Scenario 1's close step; returns the open positions after the close (or None)."""
+    if pos is None:
+        log.error("  Scenario 1: DOGEUSDT position not found")
+        return None
+    try:
+        client.positions.close(pos.position_id)
+    except Exception as e:
+        log.error("  Scenario 1: close failed: %s", e)
+        return None
+    out.append(f"  Closed via API: position_id={pos.position_id}")
+    return wait_until(client, lambda ps: all(p.position_id != pos.position_id for p in ps))
+
+
+def _setup_logging():
+    """
+    Attach handlers to the scenarios logger: INFO and below buffered in a
+    MemoryHandler (flushed by the caller), WARNING and above straight to stderr.
+    Returns the handlers so main can flush and detach them.
+    """
+    formatter = logging.Formatter("%(message)s")
+    stdout = logging.StreamHandler(sys.stdout)
+    stdout.setFormatter(formatter)
+    buffered = logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.CRITICAL + 1, target=stdout)
+    buffered.addFilter(lambda record: record.levelno < logging.WARNING)
+    errors = logging.StreamHandler(sys.stderr)
+    errors.setLevel(logging.WARNING)
+    errors.setFormatter(formatter)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    log.addHandler(buffered)
+    log.addHandler(errors)
+    return buffered, errors
+
+
+def main():
+    handlers = _setup_logging()
+    try:
+        return _run()
+    finally:
+        for handler in handlers:
+            handler.flush()
+            log.removeHandler(handler)
+            handler.close()
+
+
+def _run():
+    if "--mock" in sys.argv[1:] or os.environ.get("MUDREX_MOCK"):
+        client = FakeClient()
+    else:
+        secret = os.environ.get("MUDREX_API_SECRET")
+        if not secret:
+            log.error("Set MUDREX_API_SECRET (or use --mock)")
+            return 1
+
+        from mudrex import MudrexClient
+
+        client = MudrexClient(api_secret=secret)
+
+    try:
+        fut = get_futures_balance(client)
+        log.info("Futures balance: %s USDT\n", fut.balance)
     except Exception as e:
-        print(f"  Open failed: {e}", file=sys.stderr)
+        log.error("Balance check failed: %s", e)
+        return 1
+
+    # Scenarios trade disjoint symbols (DOGE, XRP, ARPA), so open them concurrently
+    # on the shared client (its requests session is safe to share across threads)
+    with ThreadPoolExecutor(max_workers=len(SCENARIOS)) as pool:
+        results = [future.result() for future in [pool.submit(scenario, client) for scenario in SCENARIOS]]
+
+    # One open-positions snapshot for all scenarios, indexed by symbol
+    opened = {symbol for _, symbol in results if symbol}
+    positions = wait_until(client, lambda ps: opened <= {p.symbol for p in ps})
+    by_symbol = {p.symbol: p for p in positions}
+
+    scenario1_out, scenario1_symbol = results[0]
+    if scenario1_symbol:
+        after_close = close_via_api(client, by_symbol.get(scenario1_symbol), scenario1_out)
+        # None means the close failed; an empty list is a valid "nothing left open"
+        if after_close is not None:
+            positions = after_close
+
+    for out, _ in results:
+        log.info("%s\n", "\n".join(out))
 
-    print("\n--- Summary ---")
-    positions = client.positions.list_open()
-    print(f"  Open positions now: {len(positions)}")
+    log.info("--- Summary ---")
+    log.info("  Open positions now: %d", len(positions))
     for pos in positions:
-        print(f"    {pos.symbol} position_id={pos.position_id} qty={pos.quantity}")
+        log.info("    %s position_id=%s qty=%s", pos.symbol, pos.position_id, pos.quantity)
     return 0
 
 